@@ -1,19 +1,45 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory, flash, abort
+from flask import Flask, Request, render_template, request, redirect, url_for, jsonify, send_from_directory, flash, abort, make_response
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_bcrypt import Bcrypt
+from sqlalchemy import event
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
-from functools import wraps
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 import os
+import hashlib
+import mimetypes
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
 import cv2
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
+from cachetools import TTLCache
 import re
+import secrets
+
+class UploadRequest(Request):
+    """Request that spools large file uploads into the upload spool folder"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Spooling next to the final destination lets save_upload hard-link instead of copying
+        if filename and total_content_length and total_content_length > 500 * 1024:
+            return tempfile.NamedTemporaryFile('wb+', dir=app.config['UPLOAD_SPOOL_FOLDER'], prefix='upload-')
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 # Configuration - Fixed database path
 INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
@@ -24,10 +50,21 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
     f'sqlite:///{os.path.join(INSTANCE_PATH, "database.db")}'
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True, 'pool_size': 10}
 app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
 app.config['THUMBNAIL_FOLDER'] = os.environ.get('THUMBNAIL_FOLDER', 'thumbnails')
+# Inside UPLOAD_FOLDER so spooled uploads stay on the same filesystem and can be hard-linked
+app.config['UPLOAD_SPOOL_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], '.spool')
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB
 app.config['ALLOWED_EXTENSIONS'] = {'mp4', 'avi', 'mov', 'mkv', 'webm', 'flv'}
+app.config['THUMBNAIL_WIDTH'] = 320
+app.config['MAX_YOUTUBE_BATCH'] = 50
+# Behind nginx, hand file downloads off with X-Accel-Redirect, e.g.:
+#   location /_internal_uploads/ { internal; alias /app/uploads/; sendfile on; tcp_nopush on; }
+#   location /_internal_thumbnails/ { internal; alias /app/thumbnails/; sendfile on; tcp_nopush on; }
+app.config['USE_X_ACCEL_REDIRECT'] = os.environ.get('USE_X_ACCEL_REDIRECT', '').lower() in ('1', 'true', 'yes')
+# Apache equivalent, handled by Flask's send_file
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
 db = SQLAlchemy(app)
@@ -39,6 +76,43 @@ login_manager.login_message = 'Please log in to access this page.'
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['THUMBNAIL_FOLDER'], exist_ok=True)
+os.makedirs(app.config['UPLOAD_SPOOL_FOLDER'], exist_ok=True)
+
+# Remove spool files left behind by workers killed mid-upload; the age check
+# keeps in-flight uploads of other running workers safe
+for entry in os.scandir(app.config['UPLOAD_SPOOL_FOLDER']):
+    try:
+        if entry.is_file() and time.time() - entry.stat().st_mtime > 3600:
+            os.remove(entry.path)
+    except OSError:
+        pass
+
+# Shared HTTP session so YouTube fetches reuse pooled keep-alive connections
+_HTTP = requests.Session()
+_HTTP.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+))
+_HTTP.headers['User-Agent'] = 'VideoOrganizer/1.0'
+
+# Recently verified logins, keyed by a digest of user, stored hash and password
+_LOGIN_CACHE = TTLCache(maxsize=4096, ttl=30)
+_LOGIN_CACHE_LOCK = threading.Lock()
+
+# Worker pool for concurrent YouTube thumbnail probes and oEmbed lookups
+_YT_POOL = ThreadPoolExecutor(max_workers=6)
+
+# Winning thumbnail URL per YouTube video ID, kept for a day
+_YT_THUMB_CACHE = TTLCache(maxsize=4096, ttl=86400)
+_YT_THUMB_CACHE_LOCK = threading.Lock()
+
+# Worker pool for generating uploaded-video thumbnails off the request thread
+_THUMB_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Separate I/O pool for batch YouTube imports; extract_youtube_thumbnail blocks on
+# _YT_POOL futures, so running it on _YT_POOL itself could deadlock
+_YT_BATCH_POOL = ThreadPoolExecutor(max_workers=4)
 
 # Helper function to validate redirect URLs
 def is_safe_url(target):
@@ -78,7 +152,16 @@ class User(UserMixin, db.Model):
         self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
     
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        # Short-lived fast path so duplicate submits don't pay for another bcrypt round
+        key = hashlib.sha256(f'{self.id}\0{self.password_hash}\0{password}'.encode('utf-8')).digest()
+        with _LOGIN_CACHE_LOCK:
+            if key in _LOGIN_CACHE:
+                return True
+        if not bcrypt.check_password_hash(self.password_hash, password):
+            return False
+        with _LOGIN_CACHE_LOCK:
+            _LOGIN_CACHE[key] = True
+        return True
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -92,6 +175,11 @@ class Category(db.Model):
     videos = db.relationship('Video', backref='category', lazy=True)
     user = db.relationship('User', backref='categories')
 
+    __table_args__ = (
+        db.Index('ix_category_user_name', 'user_id', 'name'),
+        db.UniqueConstraint('user_id', 'name', name='uq_category_user_name'),
+    )
+
 class Video(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -99,42 +187,125 @@ class Video(db.Model):
     video_path = db.Column(db.String(300))
     youtube_url = db.Column(db.String(300))
     is_youtube = db.Column(db.Boolean, default=False)
+    source_video_id = db.Column(db.String(16), index=True)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship('User', backref='videos')
 
+    __table_args__ = (
+        db.Index('ix_video_user_cat_date', 'user_id', 'category_id', 'upload_date'),
+        db.Index('ix_video_user_date', 'user_id', 'upload_date'),
+    )
+
 # Initialize database
+def set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Enable WAL journaling and tuned caching on each new SQLite connection"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.close()
+
 with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
     db.create_all()
+    # create_all skips existing tables, so add columns and indexes missing from older databases
+    if 'source_video_id' not in {column['name'] for column in db.inspect(db.engine).get_columns('video')}:
+        with db.engine.begin() as conn:
+            conn.execute(db.text('ALTER TABLE video ADD COLUMN source_video_id VARCHAR(16)'))
+    for table in (Category.__table__, Video.__table__):
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    # Don't hand pooled connections to forked gunicorn workers (preload_app)
+    db.engine.dispose()
+
+# Process umask, read once at import (os.umask can only be queried by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def save_upload(file, save_path):
+    """Store an uploaded file, linking the spooled temp file into place when possible"""
+    spool_path = getattr(file.stream, 'name', None)
+    if isinstance(spool_path, str) and os.path.isfile(spool_path):
+        try:
+            os.link(spool_path, save_path)
+        except OSError:
+            pass
+        else:
+            # NamedTemporaryFile creates 0600 files; give the upload the usual mode so
+            # a front proxy running as another user can serve it
+            os.chmod(save_path, 0o666 & ~_UMASK)
+            return
+    with open(save_path, 'wb') as out:
+        shutil.copyfileobj(file.stream, out, 1 << 20)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+# YouTube video ID pattern covering watch, youtu.be, embed, v/ and shorts URLs, compiled once at import
+# (an HTML-escaped '&amp;' before v= is accepted; it is only optional right before v= so the
+# parameter runs can't be split more than one way and the pattern stays backtrack-free)
+_YT_ID_RE = re.compile(r'(?:youtu\.be/|youtube\.com/(?:watch\?(?:[^&\s]*&)*(?:amp;)?v=|embed/|v/|shorts/))([A-Za-z0-9_-]{11})')
+
 def extract_video_id(youtube_url):
     """Extract YouTube video ID from URL"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, youtube_url)
-        if match:
-            return match.group(1)
-    return None
+    match = _YT_ID_RE.search(youtube_url)
+    return match.group(1) if match else None
+
+@lru_cache(maxsize=2048)
+def fetch_youtube_title(video_id):
+    """Fetch YouTube video title from oEmbed API; failures raise and are not cached"""
+    oembed_url = f'https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json'
+    response = _HTTP.get(oembed_url, timeout=10)
+    response.raise_for_status()
+    return response.json().get('title', 'YouTube Video')
 
 def get_youtube_title(video_id):
     """Get YouTube video title from oEmbed API"""
     try:
-        oembed_url = f'https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json'
-        response = requests.get(oembed_url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('title', 'YouTube Video')
+        return fetch_youtube_title(video_id)
     except Exception as e:
         print(f"Error fetching YouTube title: {e}")
     return 'YouTube Video'
 
+def probe_thumbnail_size(thumb_url):
+    """HEAD a thumbnail URL: its Content-Length on 200, 0 on any other status, None if the request itself failed"""
+    try:
+        response = _HTTP.head(thumb_url, timeout=5, allow_redirects=False)
+        if response.status_code != 200:
+            return 0
+        return int(response.headers['Content-Length'])
+    except Exception:
+        return None
+
+def reuse_youtube_thumbnail(video_id):
+    """Link a new copy of an already stored thumbnail for this YouTube video, if there is one"""
+    with app.app_context():
+        existing = Video.query.filter(
+            Video.source_video_id == video_id, Video.thumbnail_path != ''
+        ).order_by(Video.id.desc()).first()
+        if not existing:
+            return None, None
+        src = os.path.join(app.config['THUMBNAIL_FOLDER'], existing.thumbnail_path)
+        if not os.path.isfile(src):
+            return None, None
+        # Each row owns its thumbnail file (delete_video removes it), so never share one
+        thumbnail_filename = f'yt_{video_id}_{secrets.token_hex(4)}.jpg'
+        thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
+        try:
+            os.link(src, thumbnail_path)
+        except OSError:
+            shutil.copyfile(src, thumbnail_path)
+        # Keep the stored title; only retry oEmbed if the earlier add fell back to the placeholder
+        video_title = existing.title
+        if video_title == 'YouTube Video':
+            video_title = get_youtube_title(video_id)
+        return thumbnail_filename, video_title
+
 def extract_youtube_thumbnail(youtube_url):
     """Extract thumbnail from YouTube URL"""
     try:
@@ -142,60 +313,146 @@ def extract_youtube_thumbnail(youtube_url):
         if not video_id:
             return None, None
         
-        thumbnail_urls = [
-            f'https://img.youtube.com/vi/{video_id}/maxresdefault.jpg',
-            f'https://img.youtube.com/vi/{video_id}/sddefault.jpg',
-            f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg',
-            f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg',
-            f'https://img.youtube.com/vi/{video_id}/default.jpg',
-        ]
+        thumbnail_filename, video_title = reuse_youtube_thumbnail(video_id)
+        if thumbnail_filename:
+            return thumbnail_filename, video_title
         
-        video_title = get_youtube_title(video_id)
+        with _YT_THUMB_CACHE_LOCK:
+            cached = _YT_THUMB_CACHE.get(video_id)
         
-        for thumb_url in thumbnail_urls:
+        if cached:
+            # Skip the probes when this video was resolved recently; the title lookup
+            # is lru_cached on success, so only a previously failed lookup is retried
+            video_title = get_youtube_title(video_id)
+            candidates = [cached]
+        else:
+            thumbnail_urls = [
+                f'https://img.youtube.com/vi/{video_id}/maxresdefault.jpg',
+                f'https://img.youtube.com/vi/{video_id}/sddefault.jpg',
+                f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg',
+                f'https://img.youtube.com/vi/{video_id}/mqdefault.jpg',
+                f'https://img.youtube.com/vi/{video_id}/default.jpg',
+            ]
+            
+            # Probe all resolutions and fetch the title concurrently
+            title_future = _YT_POOL.submit(get_youtube_title, video_id)
+            size_futures = [_YT_POOL.submit(probe_thumbnail_size, url) for url in thumbnail_urls]
+            sizes = [future.result() for future in size_futures]
+            video_title = title_future.result()
+            
+            # Highest resolution first; fall back to sequential GETs if every HEAD failed
+            if all(size is None for size in sizes):
+                candidates = thumbnail_urls
+            else:
+                candidates = [url for url, size in zip(thumbnail_urls, sizes) if size and size > 1000]
+        
+        for thumb_url in candidates:
             try:
-                response = requests.get(thumb_url, timeout=10)
+                response = _HTTP.get(thumb_url, timeout=10)
                 if response.status_code == 200 and len(response.content) > 1000:
-                    img = Image.open(BytesIO(response.content)).convert('RGB')
-                    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-                    thumbnail_filename = f'yt_{video_id}_{timestamp}.jpg'
+                    thumbnail_filename = f'yt_{video_id}_{secrets.token_hex(4)}.jpg'
                     thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
-                    img.save(thumbnail_path, 'JPEG', quality=85)
+                    if response.headers.get('Content-Type', '').startswith('image/jpeg'):
+                        # Already a JPEG; store the bytes as-is instead of re-encoding
+                        with open(thumbnail_path, 'wb') as f:
+                            f.write(response.content)
+                    else:
+                        img = Image.open(BytesIO(response.content)).convert('RGB')
+                        img.save(thumbnail_path, 'JPEG', quality=85)
+                    with _YT_THUMB_CACHE_LOCK:
+                        _YT_THUMB_CACHE[video_id] = thumb_url
                     return thumbnail_filename, video_title
             except Exception:
                 continue
         
+        if cached:
+            with _YT_THUMB_CACHE_LOCK:
+                _YT_THUMB_CACHE.pop(video_id, None)
         return None, video_title
     except Exception as e:
         print(f"Error extracting YouTube thumbnail: {e}")
         return None, None
 
+def ffmpeg_video_thumbnail(video_path, thumbnail_path):
+    """Write a thumbnail with the ffmpeg CLI, seeking on the input side to the nearest keyframe"""
+    thumb_width = app.config['THUMBNAIL_WIDTH']
+    subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-ss', '1', '-i', video_path,
+         '-frames:v', '1', '-vf', f"scale='min({thumb_width},iw)':-2", '-q:v', '3', '-y', thumbnail_path],
+        timeout=30, check=True,
+    )
+    # Clips shorter than the seek target produce no output
+    return os.path.isfile(thumbnail_path) and os.path.getsize(thumbnail_path) > 0
+
+def opencv_video_thumbnail(video_path, thumbnail_path):
+    """Write a thumbnail by decoding a single frame with OpenCV"""
+    # Prefer hardware decoding (VA-API/NVDEC/VideoToolbox) when the FFmpeg backend has it
+    try:
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+    except cv2.error:
+        cap = None
+    if cap is None or not cap.isOpened():
+        cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return False
+    
+    # Seek by time so the backend can snap to a keyframe, then decode a single frame
+    cap.set(cv2.CAP_PROP_POS_MSEC, 1000.0)
+    if not cap.grab():
+        # Clips shorter than the seek target: use the first frame instead
+        cap.set(cv2.CAP_PROP_POS_MSEC, 0.0)
+        if not cap.grab():
+            cap.release()
+            return False
+    ret, frame = cap.retrieve()
+    cap.release()
+    
+    if not ret:
+        return False
+    height, width = frame.shape[:2]
+    thumb_width = app.config['THUMBNAIL_WIDTH']
+    if width > thumb_width:
+        frame = cv2.resize(frame, (thumb_width, max(1, height * thumb_width // width)),
+                           interpolation=cv2.INTER_AREA)
+    return cv2.imwrite(thumbnail_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+
 def generate_video_thumbnail(video_path):
     """Generate thumbnail from uploaded video"""
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return None
-        
-        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_no = min(int(fps * 1), total_frames // 2 if total_frames > 0 else 0)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+        thumbnail_filename = f'video_{secrets.token_hex(6)}.jpg'
+        thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
         
-        ret, frame = cap.read()
-        cap.release()
+        try:
+            if ffmpeg_video_thumbnail(video_path, thumbnail_path):
+                return thumbnail_filename
+        except FileNotFoundError:
+            pass  # ffmpeg not installed
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            print(f"ffmpeg thumbnail failed, falling back to OpenCV: {e}")
         
-        if ret:
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            thumbnail_filename = f'video_{timestamp}.jpg'
-            thumbnail_path = os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename)
-            cv2.imwrite(thumbnail_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        if opencv_video_thumbnail(video_path, thumbnail_path):
             return thumbnail_filename
         return None
     except Exception as e:
         print(f"Error generating thumbnail: {e}")
         return None
 
+def finalize_video_thumbnail(video_id, video_path):
+    """Generate a thumbnail in the background and attach it to the video row"""
+    with app.app_context():
+        try:
+            thumbnail_filename = generate_video_thumbnail(video_path)
+            if thumbnail_filename:
+                updated = Video.query.filter_by(id=video_id).update({'thumbnail_path': thumbnail_filename})
+                db.session.commit()
+                if not updated:
+                    # Video was deleted while the thumbnail was being generated
+                    os.remove(os.path.join(app.config['THUMBNAIL_FOLDER'], thumbnail_filename))
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving thumbnail for video {video_id}: {e}")
+
 # Authentication Routes
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
@@ -291,19 +548,26 @@ def admin_impersonate(username):
 @login_required
 def index():
     categories = Category.query.filter_by(user_id=current_user.id).order_by(Category.name).all()
-    videos_by_category = {}
-    for category in categories:
-        videos_by_category[category.name] = Video.query.filter_by(category_id=category.id, user_id=current_user.id).order_by(Video.upload_date.desc()).all()
+    # Fetch all of the user's videos in one query and bucket them by category
+    videos = Video.query.filter_by(user_id=current_user.id).order_by(Video.category_id, Video.upload_date.desc()).all()
+    category_names = {category.id: category.name for category in categories}
+    videos_by_category = {category.name: [] for category in categories}
+    for video in videos:
+        category_name = category_names.get(video.category_id)
+        if category_name is not None:
+            videos_by_category[category_name].append(video)
     return render_template('index.html', categories=categories, videos_by_category=videos_by_category)
 
 @app.route('/calendar')
 @login_required
 def calendar():
-    videos = Video.query.filter_by(user_id=current_user.id).order_by(Video.upload_date.desc()).all()
-    videos_by_date = {}
-    for video in videos:
-        date_key = video.upload_date.strftime('%Y-%m-%d')
-        videos_by_date.setdefault(date_key, []).append(video)
+    # Let the database extract the day; rows sorted by timestamp are already contiguous per day
+    upload_day = db.func.date(Video.upload_date).label('upload_day')
+    rows = db.session.query(Video, upload_day).filter(Video.user_id == current_user.id).order_by(Video.upload_date.desc()).all()
+    videos_by_date = {
+        str(day): [video for video, _ in group]
+        for day, group in groupby(rows, key=itemgetter(1))
+    }
     return render_template('calendar.html', videos_by_date=videos_by_date)
 
 @app.route('/health')
@@ -311,13 +575,59 @@ def health():
     """Health check endpoint for Docker"""
     return jsonify({"status": "healthy"}), 200
 
+def send_stored_file(folder, internal_prefix, filename):
+    """Serve a stored file, offloading the transfer to nginx when enabled"""
+    # Never expose hidden entries such as the upload spool folder
+    if any(part.startswith('.') for part in filename.replace('\\', '/').split('/')):
+        abort(404)
+    if app.config['USE_X_ACCEL_REDIRECT']:
+        path = safe_join(folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = f'{internal_prefix}/{filename}'
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    else:
+        response = send_from_directory(folder, filename, as_attachment=False, conditional=True)
+    # Stored filenames are unique per write, so their contents never change
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=False)
+    return send_stored_file(app.config['UPLOAD_FOLDER'], '/_internal_uploads', filename)
+
+def webp_thumbnail(filename):
+    """Return the WebP sibling of a JPEG thumbnail, transcoding it on first request"""
+    base, ext = os.path.splitext(filename)
+    if ext.lower() not in ('.jpg', '.jpeg'):
+        return None
+    src = safe_join(app.config['THUMBNAIL_FOLDER'], filename)
+    if src is None or not os.path.isfile(src):
+        return None
+    webp_filename = f'{base}.webp'
+    webp_path = os.path.splitext(src)[0] + '.webp'
+    if not os.path.exists(webp_path):
+        # Encode to a temp name first so concurrent requests never see a partial file
+        tmp_path = f'{webp_path}.{secrets.token_hex(4)}.tmp'
+        try:
+            with Image.open(src) as img:
+                img.save(tmp_path, 'WEBP', quality=80, method=6)
+            os.replace(tmp_path, webp_path)
+        except Exception as e:
+            print(f"Error creating WebP thumbnail: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+    return webp_filename
 
 @app.route('/thumbnails/<path:filename>')
 def thumbnail_file(filename):
-    return send_from_directory(app.config['THUMBNAIL_FOLDER'], filename, as_attachment=False)
+    accepts_webp = any(mimetype == 'image/webp' and quality > 0 for mimetype, quality in request.accept_mimetypes)
+    webp_filename = webp_thumbnail(filename) if accepts_webp else None
+    response = send_stored_file(app.config['THUMBNAIL_FOLDER'], '/_internal_thumbnails', webp_filename or filename)
+    response.vary.add('Accept')
+    return response
 
 @app.route('/add_category', methods=['POST'])
 @login_required
@@ -344,6 +654,7 @@ def add_youtube():
                 title=video_title or "YouTube Video",
                 thumbnail_path=thumbnail_filename or '',
                 youtube_url=youtube_url,
+                source_video_id=extract_video_id(youtube_url),
                 is_youtube=True,
                 category_id=int(category_id),
                 user_id=current_user.id
@@ -352,6 +663,35 @@ def add_youtube():
             db.session.commit()
     return redirect(url_for('index'))
 
+@app.route('/add_youtube_batch', methods=['POST'])
+@login_required
+def add_youtube_batch():
+    # Accept repeated fields as well as one URL per line in a textarea
+    youtube_urls = [url.strip() for value in request.form.getlist('youtube_urls')
+                    for url in value.splitlines() if url.strip()]
+    youtube_urls = youtube_urls[:app.config['MAX_YOUTUBE_BATCH']]
+    category_id = request.form.get('category_id')
+    
+    if youtube_urls and category_id:
+        results = list(_YT_BATCH_POOL.map(extract_youtube_thumbnail, youtube_urls))
+        new_videos = [
+            Video(
+                title=video_title or "YouTube Video",
+                thumbnail_path=thumbnail_filename or '',
+                youtube_url=youtube_url,
+                source_video_id=extract_video_id(youtube_url),
+                is_youtube=True,
+                category_id=int(category_id),
+                user_id=current_user.id
+            )
+            for youtube_url, (thumbnail_filename, video_title) in zip(youtube_urls, results)
+            if thumbnail_filename or video_title
+        ]
+        if new_videos:
+            db.session.add_all(new_videos)
+            db.session.commit()
+    return redirect(url_for('index'))
+
 @app.route('/upload_video', methods=['POST'])
 @login_required
 def upload_video():
@@ -364,16 +704,15 @@ def upload_video():
     
     if file and allowed_file(file.filename) and category_id:
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        filename = f"{timestamp}_{filename}"
+        # Random prefix keeps same-second uploads of the same file from colliding
+        filename = f"{secrets.token_hex(6)}_{filename}"
         save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-        
-        thumbnail_filename = generate_video_thumbnail(save_path)
+        save_upload(file, save_path)
         
+        # Save with a placeholder thumbnail; the real one is filled in by the worker pool
         new_video = Video(
             title=video_title or filename,
-            thumbnail_path=thumbnail_filename or '',
+            thumbnail_path='',
             video_path=filename,
             is_youtube=False,
             category_id=int(category_id),
@@ -381,6 +720,7 @@ def upload_video():
         )
         db.session.add(new_video)
         db.session.commit()
+        _THUMB_POOL.submit(finalize_video_thumbnail, new_video.id, save_path)
     return redirect(url_for('index'))
 
 @app.route('/get_categories')
@@ -396,11 +736,12 @@ def delete_video(video_id):
     
     if video.thumbnail_path:
         tpath = os.path.join(app.config['THUMBNAIL_FOLDER'], video.thumbnail_path)
-        if os.path.exists(tpath):
-            try:
-                os.remove(tpath)
-            except Exception:
-                pass
+        for path in (tpath, os.path.splitext(tpath)[0] + '.webp'):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
     
     if not video.is_youtube and video.video_path:
         vpath = os.path.join(app.config['UPLOAD_FOLDER'], video.video_path)
@@ -0,0 +1,11 @@
+# Gunicorn configuration for production
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+workers = multiprocessing.cpu_count()
+threads = 4
+worker_class = 'gthread'
+worker_tmp_dir = '/dev/shm'
+timeout = 120
+# Load the app once in the master so workers share read-only module state
+preload_app = True